@@ -14,6 +14,9 @@ sys.path.append(str(SRC_DIR))
 
 from recommender import recommend_recipes
 from ingestion import ingest_recipe
+from profiling import Profiler, MemorySink
+from schema import load_table, memory_usage_bytes
+from similarity import SimilarityIndex
 
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -27,53 +30,23 @@ if "all_results" not in st.session_state:
 if "visible_count" not in st.session_state:
     st.session_state.visible_count = 10
 
-# ----------------- SAFE CSV HANDLING -----------------
-def load_or_init_csv(path, columns):
-    if path.exists():
-        return pd.read_csv(path)
-    df = pd.DataFrame(columns=columns)
-    df.to_csv(path, index=False)
-    return df
+if "stage_timings" not in st.session_state:
+    st.session_state.stage_timings = None
 
-def ensure_columns(df, cols):
-    for c in cols:
-        if c not in df.columns:
-            df[c] = None
-    return df
+if "similarity_index" not in st.session_state:
+    st.session_state.similarity_index = SimilarityIndex()
 
 # ----------------- LOAD DATA -----------------
-ingredients = load_or_init_csv(
-    DATA_DIR / "ingredients.csv",
-    ["ingredient_id", "name"]
+# Tables are loaded with compact dtypes (categoricals, int32 ids, float32
+# quantities) to keep per-session memory small.
+ingredients = load_table(DATA_DIR / "ingredients.csv", "ingredients")
+recipes = load_table(DATA_DIR / "recipes.csv", "recipes")
+recipe_ingredients = load_table(
+    DATA_DIR / "recipe_ingredients.csv", "recipe_ingredients"
 )
-
-recipes = load_or_init_csv(
-    DATA_DIR / "recipes.csv",
-    [
-        "recipe_id", "name", "dish_type",
-        "cuisine", "diet_type", "dish_category",
-        "cooking_time_minutes",
-        "requires_airfryer", "requires_soaking",
-        "meal_prep_friendly", "video_link",
-        "created_at", "created_by", "is_active"
-    ]
-)
-
-recipes = ensure_columns(recipes, ["cuisine", "diet_type", "dish_category"])
-
-recipe_ingredients = load_or_init_csv(
-    DATA_DIR / "recipe_ingredients.csv",
-    ["recipe_id", "ingredient_id", "quantity", "unit", "is_optional"]
-)
-
-pantry = load_or_init_csv(
-    DATA_DIR / "pantry.csv",
-    ["ingredient_id", "quantity", "updated_at", "updated_by"]
-)
-
-recipe_feedback = load_or_init_csv(
-    DATA_DIR / "recipe_feedback.csv",
-    ["feedback_id", "recipe_id", "rating", "liked", "comments", "cooked_on", "would_make_again"]
+pantry = load_table(DATA_DIR / "pantry.csv", "pantry")
+recipe_feedback = load_table(
+    DATA_DIR / "recipe_feedback.csv", "recipe_feedback"
 )
 
 # ----------------- TABS -----------------
@@ -113,6 +86,8 @@ with tab_cook:
     allow_airfryer = st.checkbox("I can use an airfryer", value=True)
     allow_soaking = st.checkbox("I can soak ingredients overnight", value=False)
 
+    show_timings = st.checkbox("🐞 Show debug timings", value=False)
+
     if st.button("Find Recipes 🍳"):
         prefs = {
             "meal_type": meal_type,
@@ -125,18 +100,49 @@ with tab_cook:
             "min_pantry_match_pct": 0
         }
 
-        results = recommend_recipes(
-            recipes=recipes,
-            ingredients=ingredients,
-            recipe_ingredients=recipe_ingredients,
-            pantry=pantry,
-            recipe_feedback=recipe_feedback,
-            preferences=prefs,
-            top_n=len(recipes)
-        )
+        timing_sink = MemorySink() if show_timings else None
+        profiler = Profiler(timing_sink, trace_memory=True) if show_timings else None
+
+        try:
+            results = recommend_recipes(
+                recipes=recipes,
+                ingredients=ingredients,
+                recipe_ingredients=recipe_ingredients,
+                pantry=pantry,
+                recipe_feedback=recipe_feedback,
+                preferences=prefs,
+                top_n=len(recipes),
+                profiler=profiler,
+                similarity_index=st.session_state.similarity_index
+            )
+        finally:
+            if profiler:
+                profiler.close()
 
         st.session_state.all_results = results
         st.session_state.visible_count = 10
+        st.session_state.stage_timings = (
+            timing_sink.to_records() if timing_sink else None
+        )
+
+    # ---------- DEBUG TIMINGS ----------
+    if show_timings and st.session_state.stage_timings:
+        with st.expander("🐞 Stage timings", expanded=True):
+            timings = pd.DataFrame(st.session_state.stage_timings)
+            st.dataframe(timings, hide_index=True)
+            st.caption(f"Total: {timings['duration_ms'].sum():.1f} ms")
+
+            table_memory = pd.DataFrame([
+                {"table": name, "rows": len(df), "memory_kb": memory_usage_bytes(df) / 1024}
+                for name, df in [
+                    ("recipes", recipes),
+                    ("ingredients", ingredients),
+                    ("recipe_ingredients", recipe_ingredients),
+                    ("pantry", pantry),
+                    ("recipe_feedback", recipe_feedback)
+                ]
+            ])
+            st.dataframe(table_memory, hide_index=True)
 
 # ---------- DISPLAY RESULTS ----------
 results = st.session_state.all_results
@@ -146,6 +152,7 @@ if results is not None:
         st.warning("No recipes match your preferences.")
     else:
         visible = results.head(st.session_state.visible_count)
+        recipe_names = recipes.set_index("recipe_id")["name"]
 
         for _, row in visible.iterrows():
             st.markdown(f"### 🍽️ {row['name']}")
@@ -180,9 +187,24 @@ if results is not None:
                     - 🔁 Would make again: **{int(breakdown['would_make_again'] * 100)}%**
                     - 🌍 Cuisine match: **{"Yes" if breakdown['cuisine_match'] else "No"}**
                     - ⏱️ Cooking time: **{breakdown['cooking_time_minutes']} minutes**
+                    - 💛 Similar to recipes you loved: **{int(breakdown['similar_to_loved'] * 100)}%**
                     """
                 )
 
+            # ---- MORE LIKE THIS ----
+            with st.expander("🔍 More like this"):
+                similar = st.session_state.similarity_index.query(
+                    row["recipe_id"], k=3
+                )
+                if similar:
+                    for other_id, similarity in similar:
+                        st.write(
+                            f"- {recipe_names.get(other_id, other_id)} "
+                            f"({similarity * 100:.0f}% shared ingredients)"
+                        )
+                else:
+                    st.write("No similar recipes yet.")
+
             st.divider()
 
         # ---- LOAD MORE ----
@@ -313,7 +335,8 @@ with tab_ingest:
                 recipe_payload=recipe_payload,
                 ingredients_payload=st.session_state.ingredient_rows,
                 user=user,
-                paths=paths
+                paths=paths,
+                similarity_index=st.session_state.similarity_index
             )
 
             st.session_state.ingredient_rows = []
@@ -15,10 +15,13 @@ def ingest_recipe(
     recipe_payload: dict,
     ingredients_payload: list,
     user: str,
-    paths: dict
+    paths: dict,
+    similarity_index=None
 ):
     """
     Ingest a new recipe and related ingredients safely.
+
+    If a `similarity.SimilarityIndex` is given, the new recipe is added to it.
     """
 
     now = datetime.utcnow().isoformat()
@@ -49,7 +52,8 @@ def ingest_recipe(
     )
 
     # ---------- 2. Handle ingredients ----------
-    ingredients_updated = ingredients_df.copy()
+    # pd.concat below always returns a new frame, so no defensive copy needed
+    ingredients_updated = ingredients_df
     recipe_ing_rows = []
 
     for ing in ingredients_payload:
@@ -92,4 +96,43 @@ def ingest_recipe(
     ingredients_updated.to_csv(paths["ingredients"], index=False)
     recipe_ingredients_updated.to_csv(paths["recipe_ingredients"], index=False)
 
-    return recipe_id
\ No newline at end of file
+    # ---------- 4. Update similarity signatures ----------
+    if similarity_index is not None:
+        similarity_index.add(
+            recipe_id,
+            [row["ingredient_id"] for row in recipe_ing_rows]
+        )
+
+    return recipe_id
+
+def ingest_feedback(
+    feedback_df: pd.DataFrame,
+    feedback_payload: dict,
+    paths: dict
+):
+    """
+    Append a cooking feedback entry for an existing recipe.
+    """
+
+    feedback_id = _get_next_id(feedback_df, "feedback_id")
+
+    new_feedback = {
+        "feedback_id": feedback_id,
+        "recipe_id": feedback_payload["recipe_id"],
+        "rating": feedback_payload["rating"],
+        "liked": feedback_payload.get("liked", False),
+        "comments": feedback_payload.get("comments", ""),
+        "cooked_on": feedback_payload.get(
+            "cooked_on", datetime.utcnow().date().isoformat()
+        ),
+        "would_make_again": feedback_payload.get("would_make_again", False)
+    }
+
+    feedback_updated = pd.concat(
+        [feedback_df, pd.DataFrame([new_feedback])],
+        ignore_index=True
+    )
+
+    feedback_updated.to_csv(paths["recipe_feedback"], index=False)
+
+    return feedback_id
@@ -1,6 +1,9 @@
 import pandas as pd
 
 
+STATUSES = ["available", "partial", "missing", "optional"]
+
+
 def aggregate_pantry(pantry_df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate pantry quantities by ingredient_id.
@@ -37,7 +40,10 @@ def compute_recipe_ingredient_status(
     # Optional ingredients should not penalize availability
     df.loc[df["is_optional"], "is_available"] = True
 
-    df["status"] = df.apply(_ingredient_status, axis=1)
+    df["status"] = pd.Categorical(
+        df.apply(_ingredient_status, axis=1),
+        categories=STATUSES
+    )
 
     return df
 
@@ -105,22 +111,22 @@ def filter_recipes_by_preferences(
     Filters recipes based on cuisine, diet type, and constraints.
     """
 
-    df = recipes_df.copy()
+    mask = pd.Series(True, index=recipes_df.index)
 
     # Diet filter
     if "diet_type" in preferences and preferences["diet_type"]:
-        df = df[df["diet_type"] == preferences["diet_type"]]
+        mask &= recipes_df["diet_type"] == preferences["diet_type"]
 
     # Cuisine filter
     if "cuisine" in preferences and preferences["cuisine"]:
-        df = df[df["cuisine"] == preferences["cuisine"]]
+        mask &= recipes_df["cuisine"] == preferences["cuisine"]
 
     # Airfryer constraint
     if not preferences.get("allow_airfryer", True):
-        df = df[df["requires_airfryer"] == False]
+        mask &= recipes_df["requires_airfryer"] == False
 
     # Soaking constraint
     if not preferences.get("allow_soaking", False):
-        df = df[df["requires_soaking"] == False]
+        mask &= recipes_df["requires_soaking"] == False
 
-    return df
+    return recipes_df[mask]
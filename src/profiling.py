@@ -0,0 +1,229 @@
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+
+logger = logging.getLogger("kitchen_compass.profiling")
+
+
+@dataclass
+class StageSpan:
+    """
+    Timing record for a single pipeline stage.
+    """
+    stage: str
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    duration_ms: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# ---------- Sinks ----------
+
+class MemorySink:
+    """
+    Collects spans in a list (used by the app's debug panel and notebooks).
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def emit(self, span: StageSpan):
+        self.spans.append(span)
+
+    def to_records(self) -> list:
+        return [s.to_dict() for s in self.spans]
+
+    def clear(self):
+        self.spans = []
+
+
+class LogSink:
+    """
+    Writes one log line per span.
+    """
+
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO):
+        self.log = log
+        self.level = level
+
+    def emit(self, span: StageSpan):
+        self.log.log(
+            self.level,
+            "stage=%s duration_ms=%.2f rows_in=%s rows_out=%s peak_memory_bytes=%s",
+            span.stage,
+            span.duration_ms,
+            span.rows_in,
+            span.rows_out,
+            span.peak_memory_bytes
+        )
+
+
+class JsonLinesSink:
+    """
+    Appends one JSON object per span to a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, span: StageSpan):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(span.to_dict()) + "\n")
+
+
+# ---------- Memory tracing ----------
+
+# tracemalloc is process-wide, so tracing and peak bookkeeping are shared by
+# every Profiler (e.g. several Streamlit sessions) behind one lock.
+_trace_lock = threading.Lock()
+_trace_refs = 0
+_trace_owned = False
+_open_marks = []
+
+
+class _MemoryMark:
+    def __init__(self, entry: int):
+        self.entry = entry
+        self.peak = entry
+
+
+def _acquire_tracing():
+    global _trace_refs, _trace_owned
+    with _trace_lock:
+        if _trace_refs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_owned = True
+        _trace_refs += 1
+
+
+def _release_tracing():
+    global _trace_refs, _trace_owned
+    with _trace_lock:
+        _trace_refs -= 1
+        if _trace_refs == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+def _open_mark() -> _MemoryMark:
+    with _trace_lock:
+        current, peak = tracemalloc.get_traced_memory()
+
+        # Fold the running peak into every open span before resetting it,
+        # so outer (or concurrent) spans keep their own high-water mark.
+        for mark in _open_marks:
+            mark.peak = max(mark.peak, peak)
+        tracemalloc.reset_peak()
+
+        mark = _MemoryMark(current)
+        _open_marks.append(mark)
+        return mark
+
+
+def _close_mark(mark: _MemoryMark) -> int:
+    with _trace_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _open_marks.remove(mark)
+        return max(mark.peak, peak) - mark.entry
+
+
+# ---------- Profiler ----------
+
+class Profiler:
+    """
+    Emits a StageSpan to every sink for each `span(...)` block.
+
+    With `trace_memory=True`, each span reports its peak allocation above
+    the traced memory at span entry. Tracing starts on the first span and
+    is stopped by `close()` (or leaving a `with Profiler(...)` block).
+    """
+
+    enabled = True
+
+    def __init__(self, sinks=None, trace_memory: bool = False):
+        if sinks is None:
+            sinks = [MemorySink()]
+        elif not isinstance(sinks, (list, tuple)):
+            sinks = [sinks]
+        self.sinks = list(sinks)
+        self.trace_memory = trace_memory
+        self._tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._tracing:
+            _release_tracing()
+            self._tracing = False
+
+    @contextmanager
+    def span(self, stage: str, rows_in: Optional[int] = None):
+        record = StageSpan(stage=stage, rows_in=rows_in)
+
+        mark = None
+        if self.trace_memory:
+            if not self._tracing:
+                _acquire_tracing()
+                self._tracing = True
+            mark = _open_mark()
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000
+
+            if mark is not None:
+                record.peak_memory_bytes = _close_mark(mark)
+
+            for sink in self.sinks:
+                sink.emit(record)
+
+
+class _NullSpan:
+    """
+    Shared no-op span; attribute writes are accepted and discarded.
+    """
+    stage = None
+    rows_in = None
+    rows_out = None
+    duration_ms = 0.0
+    peak_memory_bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+class NullProfiler:
+    """
+    Disabled profiler: `span(...)` returns a shared no-op context manager.
+    """
+
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, stage: str, rows_in: Optional[int] = None):
+        return self._span
+
+
+NULL_PROFILER = NullProfiler()
@@ -8,9 +8,14 @@ from matcher import (
 
 from scoring import (
     aggregate_feedback,
-    apply_scoring
+    add_score_breakdown,
+    compute_scores
 )
 
+from similarity import SimilarityIndex, similar_to_loved_scores
+
+from profiling import NULL_PROFILER
+
 
 def recommend_recipes(
     recipes: pd.DataFrame,
@@ -19,88 +24,198 @@ def recommend_recipes(
     pantry: pd.DataFrame,
     recipe_feedback: pd.DataFrame,
     preferences: dict,
-    top_n: int = 5
+    top_n: int = 5,
+    profiler=None,
+    similarity_index: SimilarityIndex = None
 ) -> pd.DataFrame:
     """
     End-to-end recommendation pipeline.
+
+    Pass a `profiling.Profiler` to record per-stage timings and row counts.
     """
 
-    # 1. Pantry matching
-    ingredient_status = compute_recipe_ingredient_status(
-        recipe_ingredients, pantry
+    compiled = compile_catalog(
+        recipes,
+        ingredients,
+        recipe_ingredients,
+        pantry,
+        recipe_feedback,
+        profiler=profiler,
+        similarity_index=similarity_index
     )
 
-    recipe_metrics = compute_recipe_match_metrics(ingredient_status)
+    return rank_compiled(compiled, preferences, top_n, profiler=profiler)
 
-    missing_ingredients = get_missing_ingredients(
-        ingredient_status, ingredients
-    )
+
+def compile_catalog(
+    recipes: pd.DataFrame,
+    ingredients: pd.DataFrame,
+    recipe_ingredients: pd.DataFrame,
+    pantry: pd.DataFrame,
+    recipe_feedback: pd.DataFrame,
+    profiler=None,
+    similarity_index: SimilarityIndex = None
+) -> dict:
+    """
+    Runs the preference-independent stages once so that
+    `rank_compiled` can be called repeatedly against the result.
+
+    A long-lived `similarity_index` is synced incrementally; without one a
+    fresh index is built from `recipe_ingredients`.
+    """
+
+    prof = profiler or NULL_PROFILER
+
+    # 1. Pantry matching
+    with prof.span("ingredient_status", rows_in=len(recipe_ingredients)) as span:
+        ingredient_status = compute_recipe_ingredient_status(
+            recipe_ingredients, pantry
+        )
+        span.rows_out = len(ingredient_status)
+
+    with prof.span("match_metrics", rows_in=len(ingredient_status)) as span:
+        recipe_metrics = compute_recipe_match_metrics(ingredient_status)
+        span.rows_out = len(recipe_metrics)
+
+    with prof.span("missing_ingredients", rows_in=len(ingredient_status)) as span:
+        missing_ingredients = get_missing_ingredients(
+            ingredient_status, ingredients
+        )
+        span.rows_out = len(missing_ingredients)
 
     # 2. Merge recipe metadata
-    base_df = (
-        recipe_metrics
-        .merge(recipes, on="recipe_id", how="left")
-        .merge(missing_ingredients, on="recipe_id", how="left")
+    with prof.span("merge_metadata", rows_in=len(recipe_metrics)) as span:
+        base_df = (
+            recipe_metrics
+            .merge(recipes, on="recipe_id", how="left")
+            .merge(missing_ingredients, on="recipe_id", how="left")
+        )
+
+        base_df["missing_ingredients"] = base_df["missing_ingredients"].apply(
+            lambda v: v if isinstance(v, list) else []
+        )
+        span.rows_out = len(base_df)
+
+    # 3. Similarity index
+    with prof.span("similarity_index", rows_in=len(recipe_ingredients)) as span:
+        if similarity_index is None:
+            similarity_index = SimilarityIndex.from_recipe_ingredients(
+                recipe_ingredients
+            )
+        else:
+            similarity_index.sync(recipe_ingredients)
+        span.rows_out = len(similarity_index)
+
+    feedback_df = compile_feedback(
+        recipe_feedback, similarity_index, profiler=profiler
     )
 
-    base_df["missing_ingredients"] = base_df["missing_ingredients"].fillna('[]')
+    return {
+        "candidates": base_df,
+        "feedback": feedback_df
+    }
 
-    # Add cuisine preference signal (soft)
-    if "cuisine" in preferences and preferences["cuisine"]:
-        base_df["cuisine_match"] = (
-            base_df["cuisine"] == preferences["cuisine"]
+
+def compile_feedback(
+    recipe_feedback: pd.DataFrame,
+    similarity_index: SimilarityIndex,
+    profiler=None
+) -> pd.DataFrame:
+    """
+    Feedback-dependent part of `compile_catalog`. Rerun this alone when
+    only feedback changed; the candidates stay valid.
+    """
+
+    prof = profiler or NULL_PROFILER
+
+    # Feedback aggregation
+    with prof.span("feedback", rows_in=len(recipe_feedback)) as span:
+        feedback_agg = aggregate_feedback(recipe_feedback)
+        span.rows_out = len(feedback_agg)
+
+    # Similar-to-loved signal
+    with prof.span("similarity", rows_in=len(feedback_agg)) as span:
+        similar_scores = similar_to_loved_scores(
+            similarity_index, feedback_agg
+        )
+        feedback_agg = feedback_agg.merge(
+            similar_scores, on="recipe_id", how="outer"
         )
-    else:
-        base_df["cuisine_match"] = False
+        span.rows_out = len(similar_scores)
 
-    # 3. Apply hard constraints
-    base_df = _apply_constraints(base_df, preferences)
+    return feedback_agg
+
+
+def rank_compiled(
+    compiled: dict,
+    preferences: dict,
+    top_n: int = 5,
+    profiler=None
+) -> pd.DataFrame:
+    """
+    Applies preferences, scoring and ranking to a compiled catalog.
+    """
+
+    prof = profiler or NULL_PROFILER
+
+    # 4. Apply hard constraints
+    with prof.span("constraints", rows_in=len(compiled["candidates"])) as span:
+        base_df = _apply_constraints(compiled["candidates"], preferences)
+        span.rows_out = len(base_df)
 
     if base_df.empty:
         return base_df
 
-    # 4. Feedback aggregation
-    feedback_agg = aggregate_feedback(recipe_feedback)
+    with prof.span("merge_feedback", rows_in=len(base_df)) as span:
+        scoring_df = base_df.merge(
+            compiled["feedback"], on="recipe_id", how="left"
+        )
 
-    scoring_df = base_df.merge(
-        feedback_agg, on="recipe_id", how="left"
-    )
+        # Add cuisine preference signal (soft)
+        if "cuisine" in preferences and preferences["cuisine"]:
+            scoring_df["cuisine_match"] = (
+                scoring_df["cuisine"] == preferences["cuisine"]
+            )
+        else:
+            scoring_df["cuisine_match"] = False
+        span.rows_out = len(scoring_df)
 
     # 5. Scoring
-    scored_df = apply_scoring(scoring_df)
-
-    # 6. Rank & return
-    return (
-        scored_df
-        .sort_values(by="final_score", ascending=False)
-        .head(top_n)
-        .reset_index(drop=True)
-    )
+    with prof.span("scoring", rows_in=len(scoring_df)) as span:
+        scored_df = compute_scores(scoring_df)
+        span.rows_out = len(scored_df)
+
+    # 6. Rank & return (breakdown is only built for the rows returned)
+    with prof.span("rank", rows_in=len(scored_df)) as span:
+        ranked = add_score_breakdown(
+            scored_df
+            .sort_values(by="final_score", ascending=False)
+            .head(top_n)
+            .reset_index(drop=True)
+        )
+        span.rows_out = len(ranked)
 
+    return ranked
 
-def _apply_constraints(df: pd.DataFrame, prefs: dict) -> pd.DataFrame:
-    filtered = df.copy()
 
-    filtered = filtered[
-        filtered["pantry_match_pct"] >= prefs.get("min_pantry_match_pct", 0)
-    ]
+def _apply_constraints(df: pd.DataFrame, prefs: dict) -> pd.DataFrame:
+    # Combine every filter into one mask so the frame is only sliced once
+    mask = df["pantry_match_pct"] >= prefs.get("min_pantry_match_pct", 0)
 
     if "meal_type" in prefs and prefs["meal_type"]:
-        filtered = filtered[filtered["dish_type"] == prefs["meal_type"]]
+        mask &= df["dish_type"] == prefs["meal_type"]
 
     # ✅ HARD FILTER: Diet type
     if "diet_type" in prefs and prefs["diet_type"]:
-        filtered = filtered[filtered["diet_type"] == prefs["diet_type"]]
+        mask &= df["diet_type"] == prefs["diet_type"]
     
     if "dish_category" in prefs and prefs["dish_category"]:
-        filtered = filtered[
-            filtered["dish_category"] == prefs["dish_category"]
-        ]
+        mask &= df["dish_category"] == prefs["dish_category"]
 
     if not prefs.get("allow_airfryer", True):
-        filtered = filtered[filtered["requires_airfryer"] == False]
+        mask &= df["requires_airfryer"] == False
 
     if not prefs.get("allow_soaking", True):
-        filtered = filtered[filtered["requires_soaking"] == False]
+        mask &= df["requires_soaking"] == False
 
-    return filtered
\ No newline at end of file
+    return df[mask]
\ No newline at end of file
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Column -> compact dtype. "object" columns are kept as plain strings.
+SCHEMAS = {
+    "ingredients": {
+        "ingredient_id": "int32",
+        "name": "object"
+    },
+    "recipes": {
+        "recipe_id": "int32",
+        "name": "object",
+        "dish_type": "category",
+        "cuisine": "category",
+        "diet_type": "category",
+        "dish_category": "category",
+        "cooking_time_minutes": "int16",
+        "requires_airfryer": "bool",
+        "requires_soaking": "bool",
+        "meal_prep_friendly": "bool",
+        "video_link": "object",
+        "created_at": "object",
+        "created_by": "category",
+        "is_active": "bool"
+    },
+    "recipe_ingredients": {
+        "recipe_id": "int32",
+        "ingredient_id": "int32",
+        "quantity": "float32",
+        "unit": "category",
+        "is_optional": "bool"
+    },
+    "pantry": {
+        "ingredient_id": "int32",
+        "quantity": "float32",
+        "updated_at": "object",
+        "updated_by": "category"
+    },
+    "recipe_feedback": {
+        "feedback_id": "int32",
+        "recipe_id": "int32",
+        "rating": "float32",
+        "liked": "bool",
+        "comments": "object",
+        "cooked_on": "object",
+        "would_make_again": "bool"
+    }
+}
+
+
+def _coerce(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "object":
+        return series
+
+    if dtype == "category":
+        return series.astype("category")
+
+    if dtype == "bool":
+        if series.dtype == bool:
+            return series
+        values = series.astype(str).str.strip().str.lower()
+        return values.isin(["true", "1", "yes"])
+
+    numeric = pd.to_numeric(series, errors="coerce")
+
+    # Missing values can't live in a numpy int column; fall back to float32
+    if np.issubdtype(np.dtype(dtype), np.integer) and numeric.isna().any():
+        return numeric.astype("float32")
+
+    return numeric.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Casts a table to its compact dtypes, adding any missing schema columns.
+    """
+    schema = SCHEMAS[table]
+
+    columns = {}
+    for col in df.columns:
+        if col in schema:
+            columns[col] = _coerce(df[col], schema[col])
+        else:
+            columns[col] = df[col]
+
+    for col, dtype in schema.items():
+        if col not in columns:
+            columns[col] = _coerce(
+                pd.Series([None] * len(df), index=df.index, dtype=object),
+                dtype
+            )
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def load_table(path, table: str) -> pd.DataFrame:
+    """
+    Loads a CSV table with compact dtypes, creating an empty file if missing.
+    """
+    path = Path(path)
+
+    if path.exists():
+        df = pd.read_csv(path)
+    else:
+        df = pd.DataFrame(columns=list(SCHEMAS[table]))
+        df.to_csv(path, index=False)
+
+    return apply_schema(df, table)
+
+
+def memory_usage_bytes(df: pd.DataFrame) -> int:
+    """
+    Deep memory footprint of a table, including string payloads.
+    """
+    return int(df.memory_usage(deep=True).sum())
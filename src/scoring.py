@@ -8,8 +8,10 @@ def aggregate_feedback(feedback: pd.DataFrame) -> pd.DataFrame:
             columns=["recipe_id", "avg_rating", "would_make_again"]
         )
 
+    # Ratings may be stored as float32; average them in float64
     agg = (
         feedback
+        .astype({"rating": "float64"})
         .groupby("recipe_id")
         .agg(
             avg_rating=("rating", "mean"),
@@ -22,16 +24,26 @@ def aggregate_feedback(feedback: pd.DataFrame) -> pd.DataFrame:
 
 
 WEIGHTS = {
-    "pantry_match": 0.45,
+    "pantry_match": 0.40,
     "rating": 0.25,
     "would_make_again": 0.15,
     "cuisine_match": 0.10,
-    "time_penalty": 0.05
+    "time_penalty": 0.05,
+    "similar_to_loved": 0.05
 }
 
 
 def apply_scoring(df: pd.DataFrame) -> pd.DataFrame:
-    scored = df.copy()
+    return add_score_breakdown(compute_scores(df))
+
+
+def compute_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds `final_score` (and the cleaned inputs it uses) without the
+    per-row breakdown, so callers can rank first and explain only the top.
+    """
+    # Shallow copy: new columns don't touch the caller's frame, data isn't duplicated
+    scored = df.copy(deep=False)
 
     # ---------- Ensure columns exist ----------
     if "avg_rating" not in scored.columns:
@@ -49,20 +61,33 @@ def apply_scoring(df: pd.DataFrame) -> pd.DataFrame:
     if "cooking_time_minutes" not in scored.columns:
         scored["cooking_time_minutes"] = 60
 
+    if "similar_to_loved" not in scored.columns:
+        scored["similar_to_loved"] = 0.0
+
     # ---------- Clean values ----------
-    scored["avg_rating"] = scored["avg_rating"].fillna(3)
-    scored["would_make_again"] = scored["would_make_again"].fillna(0)
-    scored["pantry_match_pct"] = scored["pantry_match_pct"].fillna(0)
+    # Inputs may use compact storage dtypes; score in float64
+    scored["avg_rating"] = scored["avg_rating"].fillna(3).astype("float64")
+    scored["would_make_again"] = (
+        scored["would_make_again"].fillna(0).astype("float64")
+    )
+    scored["pantry_match_pct"] = (
+        scored["pantry_match_pct"].fillna(0).astype("float64")
+    )
     scored["cuisine_match"] = scored["cuisine_match"].fillna(False)
     scored["cooking_time_minutes"] = (
         scored["cooking_time_minutes"]
         .fillna(60)
         .clip(lower=5)
     )
+    scored["similar_to_loved"] = (
+        scored["similar_to_loved"].fillna(0).astype("float64")
+    )
 
     # ---------- Time score ----------
-    max_time = max(scored["cooking_time_minutes"].max(), 1)
-    scored["time_score"] = 1 - (scored["cooking_time_minutes"] / max_time)
+    # float64 copy for the ratio only; the output column stays an integer
+    cooking_time = scored["cooking_time_minutes"].astype("float64")
+    max_time = max(cooking_time.max(), 1)
+    scored["time_score"] = 1 - (cooking_time / max_time)
 
     # ---------- Final score ----------
     scored["final_score"] = (
@@ -70,9 +95,19 @@ def apply_scoring(df: pd.DataFrame) -> pd.DataFrame:
         WEIGHTS["rating"] * (scored["avg_rating"] / 5) +
         WEIGHTS["would_make_again"] * scored["would_make_again"] +
         WEIGHTS["cuisine_match"] * scored["cuisine_match"].astype(int) +
-        WEIGHTS["time_penalty"] * scored["time_score"]
+        WEIGHTS["time_penalty"] * scored["time_score"] +
+        WEIGHTS["similar_to_loved"] * scored["similar_to_loved"]
     )
 
+    return scored
+
+
+def add_score_breakdown(scored: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the per-row `score_breakdown` dict shown in the UI.
+    """
+    scored = scored.copy(deep=False)
+
     # ---------- Score breakdown (for UI) ----------
     scored["score_breakdown"] = scored.apply(
         lambda r: {
@@ -80,7 +115,8 @@ def apply_scoring(df: pd.DataFrame) -> pd.DataFrame:
             "avg_rating": round(r["avg_rating"], 2),
             "would_make_again": round(r["would_make_again"], 2),
             "cuisine_match": bool(r["cuisine_match"]),
-            "cooking_time_minutes": int(r["cooking_time_minutes"])
+            "cooking_time_minutes": int(r["cooking_time_minutes"]),
+            "similar_to_loved": round(r["similar_to_loved"], 2)
         },
         axis=1
     )
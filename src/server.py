@@ -0,0 +1,538 @@
+"""
+Headless Kitchen Compass service.
+
+Loads and compiles the catalog once, then answers JSON requests against the
+warm in-memory state. Run locally with:
+
+    python src/server.py --port 8000
+
+Endpoints:
+    GET  /health
+    POST /recommend  {"preferences": {...}, "top_n": 5}
+    POST /ingest     {"recipe": {...}, "ingredients": [...], "user": "Tanvi"}
+    POST /feedback   {"recipe_id": 3, "rating": 5, "would_make_again": true}
+    GET  /similar?recipe_id=3&k=5
+"""
+
+import argparse
+import json
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from ingestion import ingest_feedback, ingest_recipe
+from recommender import compile_catalog, compile_feedback, rank_compiled
+from schema import SCHEMAS, load_table
+from similarity import SimilarityIndex
+
+
+logger = logging.getLogger("kitchen_compass.server")
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+class CatalogState:
+    """
+    Immutable snapshot of the loaded tables plus their compiled form.
+    """
+
+    def __init__(
+        self,
+        paths: dict,
+        mtimes: dict,
+        tables: dict,
+        compiled: dict,
+        cache_size: int = 256
+    ):
+        self.paths = paths
+        self.mtimes = mtimes
+        self.tables = tables
+        self.compiled = compiled
+
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, data_dir: Path, similarity_index: SimilarityIndex):
+        """
+        Reads every table from `data_dir` and compiles the full catalog.
+        """
+        paths = {
+            table: data_dir / f"{table}.csv" for table in SCHEMAS
+        }
+        mtimes = _mtimes(paths)
+        tables = {
+            table: load_table(path, table)
+            for table, path in paths.items()
+        }
+        compiled = compile_catalog(
+            tables["recipes"],
+            tables["ingredients"],
+            tables["recipe_ingredients"],
+            tables["pantry"],
+            tables["recipe_feedback"],
+            similarity_index=similarity_index
+        )
+        return cls(paths, mtimes, tables, compiled)
+
+    def with_feedback(self, similarity_index: SimilarityIndex):
+        """
+        New snapshot with `recipe_feedback` re-read from disk. Only the
+        feedback stages are recomputed; candidates are reused as-is.
+        """
+        path = self.paths["recipe_feedback"]
+
+        mtimes = dict(self.mtimes)
+        mtimes.update(_mtimes({"recipe_feedback": path}))
+
+        tables = dict(self.tables)
+        tables["recipe_feedback"] = load_table(path, "recipe_feedback")
+
+        compiled = dict(self.compiled)
+        compiled["feedback"] = compile_feedback(
+            tables["recipe_feedback"], similarity_index
+        )
+
+        return CatalogState(self.paths, mtimes, tables, compiled)
+
+    def recommend(self, preferences: dict, top_n: int) -> str:
+        """
+        Returns ranked recipes as a JSON array, memoised per snapshot.
+        """
+        key = (json.dumps(preferences, sort_keys=True), top_n)
+
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        ranked = rank_compiled(self.compiled, preferences, top_n)
+        body = ranked.to_json(orient="records")
+
+        with self._cache_lock:
+            self._cache[key] = body
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return body
+
+
+class RequestError(Exception):
+    """
+    Client-facing error; the handler replies with `status` and the message.
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------- Payload validation ----------
+
+def _require(payload: dict, field: str):
+    if field not in payload:
+        raise RequestError(f"Missing field '{field}'")
+    return payload[field]
+
+
+def _check_int(value, field: str, minimum: int = None) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise RequestError(f"'{field}' must be an integer")
+    if minimum is not None and value < minimum:
+        raise RequestError(f"'{field}' must be >= {minimum}")
+    return value
+
+
+def _parse_int(value, field: str, minimum: int = None) -> int:
+    # Query-string values arrive as text
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            raise RequestError(f"'{field}' must be an integer")
+    return _check_int(value, field, minimum)
+
+
+def _check_number(value, field: str, minimum=None, maximum=None) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RequestError(f"'{field}' must be a number")
+    if minimum is not None and value < minimum:
+        raise RequestError(f"'{field}' must be >= {minimum}")
+    if maximum is not None and value > maximum:
+        raise RequestError(f"'{field}' must be <= {maximum}")
+    return value
+
+
+def _check_type(value, field: str, expected: type, label: str):
+    if not isinstance(value, expected):
+        raise RequestError(f"'{field}' must be {label}")
+    return value
+
+
+def _validate_recipe(recipe) -> dict:
+    _check_type(recipe, "recipe", dict, "an object")
+
+    for field in (
+        "name", "dish_type", "cuisine", "diet_type",
+        "dish_category", "video_link"
+    ):
+        _check_type(_require(recipe, field), field, str, "a string")
+
+    _check_int(
+        _require(recipe, "cooking_time_minutes"), "cooking_time_minutes", 1
+    )
+
+    for field in ("requires_airfryer", "requires_soaking", "meal_prep_friendly"):
+        _check_type(_require(recipe, field), field, bool, "a boolean")
+
+    return recipe
+
+
+def _validate_ingredients(ingredients) -> list:
+    _check_type(ingredients, "ingredients", list, "a list")
+    if not ingredients:
+        raise RequestError("'ingredients' must not be empty")
+
+    for ing in ingredients:
+        _check_type(ing, "ingredients[]", dict, "an object")
+        _check_type(_require(ing, "name"), "name", str, "a string")
+        _check_number(_require(ing, "quantity"), "quantity", minimum=0)
+        _check_type(_require(ing, "unit"), "unit", str, "a string")
+        _check_type(_require(ing, "is_optional"), "is_optional", bool, "a boolean")
+
+    return ingredients
+
+
+def _validate_preferences(preferences) -> dict:
+    _check_type(preferences, "preferences", dict, "an object")
+
+    for field in ("meal_type", "diet_type", "cuisine", "dish_category"):
+        value = preferences.get(field)
+        if value is not None:
+            _check_type(value, field, str, "a string or null")
+
+    if "min_pantry_match_pct" in preferences:
+        _check_number(
+            preferences["min_pantry_match_pct"], "min_pantry_match_pct", 0, 100
+        )
+
+    for field in ("allow_airfryer", "allow_soaking"):
+        if field in preferences:
+            _check_type(preferences[field], field, bool, "a boolean")
+
+    return preferences
+
+
+def _validate_feedback(payload: dict) -> dict:
+    _check_int(_require(payload, "recipe_id"), "recipe_id")
+    _check_number(_require(payload, "rating"), "rating", 1, 5)
+
+    for field in ("liked", "would_make_again"):
+        if field in payload:
+            _check_type(payload[field], field, bool, "a boolean")
+
+    for field in ("comments", "cooked_on"):
+        if field in payload:
+            _check_type(payload[field], field, str, "a string")
+
+    return payload
+
+
+def _mtimes(paths: dict) -> dict:
+    return {
+        table: path.stat().st_mtime_ns if path.exists() else None
+        for table, path in paths.items()
+    }
+
+
+class RecommendationService:
+    """
+    Owns the current CatalogState and swaps it when data files change.
+    """
+
+    def __init__(self, data_dir: Path, poll_interval: float = 2.0):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        self.poll_interval = poll_interval
+
+        # Writers (ingest/feedback/reload) are serialised; readers just grab
+        # `self.state`, which is replaced in a single assignment.
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._failed_mtimes = None
+
+        # Shared across snapshots so reloads only re-hash changed recipes
+        self.similarity_index = SimilarityIndex()
+        self.state = CatalogState.load(self.data_dir, self.similarity_index)
+
+    # ---------- Reloading ----------
+
+    def reload(self, force: bool = False) -> bool:
+        with self._write_lock:
+            return self._reload_locked(force)
+
+    def _reload_locked(self, force: bool = False) -> bool:
+        current = self.state
+        mtimes = _mtimes(current.paths)
+        if not force and mtimes in (current.mtimes, self._failed_mtimes):
+            return False
+
+        try:
+            self.state = CatalogState.load(self.data_dir, self.similarity_index)
+        except Exception:
+            # Keep serving the last good snapshot until the files change again
+            self._failed_mtimes = mtimes
+            raise
+
+        logger.info("Reloaded catalog from %s", self.data_dir)
+        return True
+
+    def _fresh_state_locked(self) -> CatalogState:
+        """
+        Reloads external edits before a write. Refuses the write if the
+        files on disk differ from the in-memory snapshot, since writing the
+        snapshot back would overwrite those edits.
+        """
+        try:
+            self._reload_locked()
+        except Exception:
+            logger.exception("Reload before write failed")
+
+        state = self.state
+        if _mtimes(state.paths) != state.mtimes:
+            raise RequestError(
+                "Data files changed on disk but could not be reloaded; "
+                "fix them before writing",
+                status=409
+            )
+        return state
+
+    def start_watcher(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self._watch, name="catalog-watcher", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Background reload failed")
+
+    # ---------- Operations ----------
+
+    def recommend(self, payload: dict) -> str:
+        preferences = _validate_preferences(payload.get("preferences", {}))
+        top_n = _check_int(payload.get("top_n", 5), "top_n", 1)
+        return self.state.recommend(preferences, top_n)
+
+    def similar(self, payload: dict) -> dict:
+        recipe_id = _parse_int(_require(payload, "recipe_id"), "recipe_id")
+        k = _parse_int(payload.get("k", 5), "k", 1)
+
+        # The index has its own lock, so lookups don't queue behind writes
+        state = self.state
+        if recipe_id not in self.similarity_index:
+            raise RequestError(f"Unknown recipe_id {recipe_id}", status=404)
+        matches = self.similarity_index.query(recipe_id, k)
+
+        names = state.tables["recipes"].set_index("recipe_id")["name"]
+
+        return {
+            "recipe_id": recipe_id,
+            "similar": [
+                {
+                    "recipe_id": other,
+                    "name": names.get(other),
+                    "similarity": round(similarity, 4)
+                }
+                for other, similarity in matches
+            ]
+        }
+
+    def ingest(self, payload: dict) -> dict:
+        recipe = _validate_recipe(_require(payload, "recipe"))
+        ingredients = _validate_ingredients(_require(payload, "ingredients"))
+        user = _check_type(_require(payload, "user"), "user", str, "a string")
+
+        with self._write_lock:
+            state = self._fresh_state_locked()
+            recipe_id = ingest_recipe(
+                recipes_df=state.tables["recipes"],
+                ingredients_df=state.tables["ingredients"],
+                recipe_ingredients_df=state.tables["recipe_ingredients"],
+                recipe_payload=recipe,
+                ingredients_payload=ingredients,
+                user=user,
+                paths=state.paths,
+                similarity_index=self.similarity_index
+            )
+
+            # The row is already on disk; a failed refresh must not make the
+            # client retry and write a duplicate. Later writes get a 409
+            # until the files can be reloaded.
+            try:
+                self._reload_locked(force=True)
+            except Exception:
+                logger.exception("Reload after ingest failed")
+
+        return {"recipe_id": int(recipe_id)}
+
+    def feedback(self, payload: dict) -> dict:
+        _validate_feedback(payload)
+
+        with self._write_lock:
+            state = self._fresh_state_locked()
+            if payload["recipe_id"] not in set(
+                state.tables["recipes"]["recipe_id"].tolist()
+            ):
+                raise RequestError(
+                    f"Unknown recipe_id {payload['recipe_id']}", status=404
+                )
+
+            feedback_id = ingest_feedback(
+                feedback_df=state.tables["recipe_feedback"],
+                feedback_payload=payload,
+                paths=state.paths
+            )
+
+            # Same as ingest: the row is written, so report success regardless
+            try:
+                self.state = state.with_feedback(self.similarity_index)
+            except Exception:
+                logger.exception("Refresh after feedback failed")
+
+        return {"feedback_id": int(feedback_id)}
+
+
+# ---------- HTTP layer ----------
+
+class RequestHandler(BaseHTTPRequestHandler):
+    service: RecommendationService = None
+
+    routes = {
+        "/recommend": "recommend",
+        "/ingest": "ingest",
+        "/feedback": "feedback"
+    }
+
+    get_routes = {
+        "/similar": "similar"
+    }
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok"})
+            return
+
+        operation = self.get_routes.get(url.path)
+        if operation is None:
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        params = {
+            key: values[-1] for key, values in parse_qs(url.query).items()
+        }
+        self._dispatch(operation, params)
+
+    def do_POST(self):
+        operation = self.routes.get(self.path)
+        if operation is None:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        self._dispatch(operation, payload)
+
+    def _dispatch(self, operation: str, payload: dict):
+        try:
+            result = getattr(self.service, operation)(payload)
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception("%s failed", operation)
+            self._send_json(500, {"error": str(e)})
+            return
+
+        if isinstance(result, str):
+            self._send_raw(200, result.encode())
+        else:
+            self._send_json(200, result)
+
+    def _send_json(self, status: int, obj):
+        self._send_raw(status, json.dumps(obj).encode())
+
+    def _send_raw(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(
+    service: RecommendationService,
+    host: str = "127.0.0.1",
+    port: int = 8000
+) -> ThreadingHTTPServer:
+    handler = type("BoundRequestHandler", (RequestHandler,), {"service": service})
+    return _Server((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kitchen Compass API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument(
+        "--poll-interval", type=float, default=2.0,
+        help="Seconds between data file change checks"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    service = RecommendationService(args.data_dir, args.poll_interval)
+    service.start_watcher()
+
+    server = make_server(service, args.host, args.port)
+    logger.info("Serving on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import threading
+from collections import Counter
+
+import pandas as pd
+
+
+class SimilarityIndex:
+    """
+    Inverted index (ingredient_id -> recipe_ids) over recipe ingredient sets.
+
+    Queries only touch recipes sharing at least one ingredient with the
+    query recipe, and rank them by exact Jaccard overlap. Unlike LSH
+    banding this never misses a low-overlap neighbour.
+
+    Safe to query from several threads while another one updates it.
+    """
+
+    def __init__(self):
+        self._ingredients = {}
+        self._postings = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ingredients)
+
+    def __contains__(self, recipe_id) -> bool:
+        with self._lock:
+            return int(recipe_id) in self._ingredients
+
+    @classmethod
+    def from_recipe_ingredients(cls, recipe_ingredients_df: pd.DataFrame):
+        index = cls()
+        index.sync(recipe_ingredients_df)
+        return index
+
+    # ---------- Building ----------
+
+    def add(self, recipe_id, ingredient_ids):
+        """
+        Adds or replaces a recipe's ingredient set.
+        """
+        recipe_id = int(recipe_id)
+        ingredient_ids = frozenset(int(i) for i in ingredient_ids)
+
+        with self._lock:
+            if self._ingredients.get(recipe_id) == ingredient_ids:
+                return
+
+            self.remove(recipe_id)
+            if not ingredient_ids:
+                return
+
+            self._ingredients[recipe_id] = ingredient_ids
+            for ingredient_id in ingredient_ids:
+                self._postings.setdefault(ingredient_id, set()).add(recipe_id)
+
+    def remove(self, recipe_id):
+        recipe_id = int(recipe_id)
+
+        with self._lock:
+            ingredient_ids = self._ingredients.pop(recipe_id, None)
+
+            if ingredient_ids is None:
+                return
+
+            for ingredient_id in ingredient_ids:
+                posting = self._postings.get(ingredient_id)
+                if posting is not None:
+                    posting.discard(recipe_id)
+                    if not posting:
+                        del self._postings[ingredient_id]
+
+    def sync(self, recipe_ingredients_df: pd.DataFrame):
+        """
+        Brings the index in line with `recipe_ingredients_df`, only
+        touching recipes whose ingredient set changed.
+        """
+        # Blank ids load as NaN; skip those rows like the matcher does
+        current = {
+            int(recipe_id): ids
+            for recipe_id, ids in (
+                recipe_ingredients_df
+                .dropna(subset=["recipe_id", "ingredient_id"])
+                .groupby("recipe_id")["ingredient_id"]
+                .apply(list)
+                .items()
+            )
+        }
+
+        with self._lock:
+            for recipe_id in set(self._ingredients) - set(current):
+                self.remove(recipe_id)
+
+            for recipe_id, ingredient_ids in current.items():
+                self.add(recipe_id, ingredient_ids)
+
+    # ---------- Querying ----------
+
+    def query(self, recipe_id, k: int = 5) -> list:
+        """
+        Top-k recipes similar to `recipe_id` as (recipe_id, similarity)
+        pairs, where similarity is ingredient Jaccard overlap.
+        """
+        recipe_id = int(recipe_id)
+
+        with self._lock:
+            ingredients = self._ingredients.get(recipe_id)
+            if ingredients is None:
+                return []
+
+            # Shared-ingredient counts for every recipe in a common posting list
+            overlaps = Counter()
+            for ingredient_id in ingredients:
+                overlaps.update(self._postings.get(ingredient_id, ()))
+            overlaps.pop(recipe_id, None)
+
+            sizes = {other: len(self._ingredients[other]) for other in overlaps}
+
+        scored = [
+            (other, overlap / (len(ingredients) + sizes[other] - overlap))
+            for other, overlap in overlaps.items()
+        ]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+
+        return scored[:k] if k is not None else scored
+
+
+def loved_recipe_ids(
+    feedback_agg: pd.DataFrame,
+    min_rating: float = 4,
+    min_would_make_again: float = 0.5
+) -> list:
+    """
+    Recipes whose average rating is at least `min_rating`, or that most
+    feedback says the user would make again. Takes `aggregate_feedback`
+    output so a later low rating can un-love a recipe.
+    """
+    if feedback_agg.empty:
+        return []
+
+    loved = feedback_agg[
+        (pd.to_numeric(feedback_agg["avg_rating"], errors="coerce") >= min_rating) |
+        (
+            pd.to_numeric(feedback_agg["would_make_again"], errors="coerce")
+            >= min_would_make_again
+        )
+    ]
+
+    return sorted(set(loved["recipe_id"].dropna().astype(int)))
+
+
+def similar_to_loved_scores(
+    index: SimilarityIndex,
+    feedback_agg: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Per-recipe similarity (0-1) to the closest *other* loved recipe.
+    """
+    best = {}
+
+    for loved_id in loved_recipe_ids(feedback_agg):
+        for other, similarity in index.query(loved_id, k=None):
+            if similarity > best.get(other, 0.0):
+                best[other] = similarity
+
+    return pd.DataFrame({
+        "recipe_id": pd.Series(list(best.keys()), dtype="int32"),
+        "similar_to_loved": pd.Series(list(best.values()), dtype="float64")
+    })